@@ -0,0 +1,426 @@
+import os
+import argparse
+import time
+import socket
+import sqlite3
+import multiprocessing
+
+
+class ExtractionWorkQueue:
+    def __init__(self, queue_path, timeout=60, max_attempts=3):
+        """Initialize variables for instance of extraction_work_queue class. Creates the SQLite work queue file at
+        queue_path if it does not exist yet.
+
+        The queue uses SQLite's default rollback journal (not WAL mode) so it can be shared between nodes through a
+        network filesystem, as long as that filesystem supports file locking.
+
+        self.queue_path (str): filepath of SQLite work queue file on storage shared by all worker nodes
+        self.timeout (int): seconds to wait for another worker's lock on the queue before raising an error
+        self.max_attempts (int): times a faculty bio is claimed before it is marked as failed
+        """
+        self.queue_path = queue_path
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+
+        connection = self.connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("""CREATE TABLE IF NOT EXISTS tasks (
+                    position INTEGER PRIMARY KEY,
+                    bio_id INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker_id TEXT,
+                    lease_expires REAL,
+                    name TEXT,
+                    email_address TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT
+                )""")
+            # meta holds the run ID, which publish() increases every time it publishes a new run
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)"
+            )
+            # add columns missing from work queues created by earlier versions
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(tasks)")]
+            if "attempts" not in columns:
+                connection.execute(
+                    "ALTER TABLE tasks ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0"
+                )
+            if "error" not in columns:
+                connection.execute("ALTER TABLE tasks ADD COLUMN error TEXT")
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def connect(self):
+        """Opens a connection to the work queue. Transactions are started manually with BEGIN IMMEDIATE so that only
+        one worker at a time can claim faculty bios.
+
+        Returns:
+            connection (Connection): SQLite connection to work queue
+        """
+        connection = sqlite3.connect(
+            self.queue_path, timeout=self.timeout, isolation_level=None
+        )
+
+        return connection
+
+    def publish(self, bios_to_run):
+        """Publishes faculty bio IDs to the work queue, one task per position in bios_to_run so that results can be merged
+        in the same order as a single-machine run (bios_to_run may contain the same bio ID more than once). If an
+        unfinished queue already holds the same faculty bio IDs, e.g. after the coordinating process was restarted, the
+        existing tasks and results are kept so the run resumes where it stopped. If every faculty bio in the queue is
+        already done or failed, e.g. the queue from last night's run, the old results are cleared and all faculty bios
+        are published again, so a new run never returns old results without performing extractions. Publishing a new
+        run increases the run ID, which tells workers waiting on the finished queue that new faculty bios are ready.
+
+        Args:
+            bios_to_run (iterable): faculty bio ID numbers to perform extractions on
+
+        Returns:
+            run_id (int): ID of the published or resumed run
+        """
+        bios_to_run = [int(i) for i in bios_to_run]
+        connection = self.connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            published = [
+                row[0]
+                for row in connection.execute(
+                    "SELECT bio_id FROM tasks ORDER BY position"
+                )
+            ]
+            num_unfinished = connection.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status NOT IN ('done', 'failed')"
+            ).fetchone()[0]
+            run_id = self.read_run_id(connection)
+            if published and num_unfinished == 0:
+                # previous run finished, start a new run instead of reusing its results
+                print(
+                    "Work queue "
+                    + self.queue_path
+                    + " is finished, clearing old results"
+                )
+                connection.execute("DELETE FROM tasks")
+                published = []
+            if published and published != bios_to_run:
+                raise ValueError(
+                    "Work queue "
+                    + self.queue_path
+                    + " already holds different faculty bios"
+                )
+            if not published:
+                connection.executemany(
+                    "INSERT INTO tasks (position, bio_id) VALUES (?, ?)",
+                    enumerate(bios_to_run),
+                )
+                run_id += 1
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('run_id', ?)",
+                    (run_id,),
+                )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+        return run_id
+
+    def read_run_id(self, connection):
+        """Reads the ID of the latest published run using an open connection to the work queue.
+
+        Args:
+            connection (Connection): SQLite connection to work queue
+
+        Returns:
+            int: ID of latest published run, or 0 if no faculty bios have been published yet
+        """
+        row = connection.execute(
+            "SELECT value FROM meta WHERE key = 'run_id'"
+        ).fetchone()
+
+        return row[0] if row else 0
+
+    def claim_batch(self, worker_id, batch_size=10, lease_seconds=600):
+        """Claims up to batch_size faculty bios for worker_id. A faculty bio can be claimed if it is still pending or if
+        another worker's lease on it has expired (e.g. that worker crashed), so no faculty bio is lost if a node fails.
+        A faculty bio whose lease expired after self.max_attempts claims is marked as failed instead of being claimed
+        again, so a faculty bio that crashes every worker does not stop the run.
+
+        Args:
+            worker_id (str): unique name of worker claiming faculty bios
+            batch_size (int, optional): maximum number of faculty bios to claim. Defaults to 10.
+            lease_seconds (int, optional): seconds before unfinished faculty bios can be reclaimed. Defaults to 600.
+
+        Returns:
+            batch (list): (position, bio_id) tuples claimed by worker_id, empty if no faculty bios can be claimed
+        """
+        now = time.time()
+        connection = self.connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                """UPDATE tasks SET status = 'failed', error = 'lease expired', lease_expires = NULL
+                WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?""",
+                (now, self.max_attempts),
+            )
+            batch = connection.execute(
+                """SELECT position, bio_id FROM tasks
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY position LIMIT ?""",
+                (now, batch_size),
+            ).fetchall()
+            connection.executemany(
+                """UPDATE tasks SET status = 'leased', worker_id = ?, lease_expires = ?, attempts = attempts + 1
+                WHERE position = ?""",
+                [(worker_id, now + lease_seconds, position) for position, _ in batch],
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+        return batch
+
+    def complete_batch(self, worker_id, results):
+        """Saves extraction results for faculty bios claimed by worker_id and marks them as done. Results for faculty
+        bios that are already done (e.g. finished by another worker after worker_id's lease expired) are ignored.
+
+        Args:
+            worker_id (str): unique name of worker that performed the extractions
+            results (list): (position, name, email_address) tuples for claimed faculty bios
+
+        Returns:
+            None
+        """
+        connection = self.connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                """UPDATE tasks SET status = 'done', worker_id = ?, name = ?, email_address = ?
+                WHERE position = ? AND status != 'done'""",
+                [
+                    (worker_id, name, email_address, position)
+                    for position, name, email_address in results
+                ],
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+        return None
+
+    def fail_task(self, worker_id, position, error):
+        """Records that extractions on a faculty bio claimed by worker_id raised an error. The faculty bio is released
+        so it can be claimed again, or marked as failed once it has been claimed self.max_attempts times.
+
+        Args:
+            worker_id (str): unique name of worker that claimed the faculty bio
+            position (int): position of faculty bio in the work queue
+            error (str): description of the error
+
+        Returns:
+            None
+        """
+        connection = self.connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                """UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                error = ?, lease_expires = NULL
+                WHERE position = ? AND status = 'leased' AND worker_id = ?""",
+                (self.max_attempts, error, position, worker_id),
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+        return None
+
+    def get_status_counts(self):
+        """Counts faculty bios in each status of the work queue.
+
+        Returns:
+            status_counts (dict): number of "pending", "leased", "done", and "failed" faculty bios
+        """
+        connection = self.connect()
+        status_counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        status_counts.update(
+            connection.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")
+        )
+        connection.close()
+
+        return status_counts
+
+    def is_finished(self):
+        """Checks if extractions have been performed on all published faculty bios. A queue with no published faculty
+        bios is not finished, so workers started before perform_extractions() publishes the faculty bios keep waiting.
+        Failed faculty bios count as finished.
+
+        Returns:
+            bool: True if faculty bios have been published and none are pending or leased
+        """
+        status_counts = self.get_status_counts()
+
+        return (
+            status_counts["done"] + status_counts["failed"] > 0
+            and status_counts["pending"] == 0
+            and status_counts["leased"] == 0
+        )
+
+    def get_run_status(self):
+        """Reads the latest run ID and whether that run is finished in a single read transaction, so a run published
+        by the coordinating process in between cannot be mistaken for a finished one.
+
+        Returns:
+            run_id (int): ID of latest published run, or 0 if no faculty bios have been published yet
+            finished (bool): True if the run has faculty bios and none are pending or leased
+        """
+        connection = self.connect()
+        try:
+            connection.execute("BEGIN")
+            run_id = self.read_run_id(connection)
+            num_published, num_unfinished = connection.execute(
+                "SELECT COUNT(*), TOTAL(status IN ('pending', 'leased')) FROM tasks"
+            ).fetchone()
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+        return run_id, num_published > 0 and num_unfinished == 0
+
+    def get_results(self):
+        """Merges the extraction results of all workers in the order the faculty bios were published. Failed faculty
+        bios get empty results, the same as faculty bios where no name or email address was found.
+
+        Returns:
+            bios_to_run (list): faculty bio ID numbers in published order
+            names (list): faculty names extracted from faculty bios
+            email_addresses (list): faculty email addresses extracted from faculty bios
+        """
+        if not self.is_finished():
+            raise RuntimeError(
+                "Work queue " + self.queue_path + " still has unfinished faculty bios"
+            )
+
+        connection = self.connect()
+        rows = connection.execute(
+            """SELECT bio_id, COALESCE(name, ''), COALESCE(email_address, '')
+            FROM tasks ORDER BY position"""
+        ).fetchall()
+        failed = connection.execute(
+            "SELECT bio_id, error FROM tasks WHERE status = 'failed' ORDER BY position"
+        ).fetchall()
+        connection.close()
+
+        for bio_id, error in failed:
+            print("Extractions failed on Faculty Bio ID: ", bio_id, error)
+
+        bios_to_run = [row[0] for row in rows]
+        names = [row[1] for row in rows]
+        email_addresses = [row[2] for row in rows]
+
+        return bios_to_run, names, email_addresses
+
+
+def get_worker_id():
+    """Creates a worker name that is unique across nodes sharing the work queue.
+
+    Returns:
+        str: host name and process ID of current process
+    """
+    return socket.gethostname() + "-" + str(os.getpid())
+
+
+def run_local_worker(queue_path, memory_bounded=False, max_bio_chars=None, run_id=None):
+    """Loads the extraction model and works on the queue at queue_path until all faculty bios are done. Used as the
+    target of each local worker process.
+
+    Args:
+        queue_path (str): filepath of SQLite work queue file
+        memory_bounded (bool, optional): run extractions in memory-bounded mode. Defaults to False.
+        max_bio_chars (int, optional): per-bio size budget in characters. Defaults to None.
+        run_id (int, optional): ID of the run to work on, see ExtractBioEntities.run_worker(). Defaults to None.
+
+    Returns:
+        None
+    """
+    from extract_entities import ExtractBioEntities
+
+    ExtractBioEntities(
+        memory_bounded=memory_bounded, max_bio_chars=max_bio_chars
+    ).run_worker(queue_path, run_id=run_id)
+
+    return None
+
+
+def start_local_workers(
+    queue_path, num_workers, memory_bounded=False, max_bio_chars=None, run_id=None
+):
+    """Starts num_workers worker processes on this node and waits for them to finish. Run this on each node sharing
+    the work queue while perform_extractions(queue_path=queue_path) runs on the coordinating node.
+
+    Args:
+        queue_path (str): filepath of SQLite work queue file
+        num_workers (int): number of worker processes to start on this node
+        memory_bounded (bool, optional): run extractions in memory-bounded mode. Defaults to False.
+        max_bio_chars (int, optional): per-bio size budget in characters. Defaults to None.
+        run_id (int, optional): ID of the run to work on, see ExtractBioEntities.run_worker(). Defaults to None.
+
+    Returns:
+        None
+    """
+    workers = [
+        multiprocessing.Process(
+            target=run_local_worker,
+            args=(queue_path, memory_bounded, max_bio_chars, run_id),
+        )
+        for _ in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    return None
+
+
+if __name__ == "__main__":
+    # example: python distribute_extractions.py results/work_queue.db 4 --memory-bounded --max-bio-chars 100000
+    parser = argparse.ArgumentParser(
+        description="Start entity extraction workers for a shared work queue"
+    )
+    parser.add_argument("queue_path", help="filepath of SQLite work queue file")
+    parser.add_argument(
+        "num_workers", nargs="?", type=int, default=1, help="worker processes to start"
+    )
+    parser.add_argument(
+        "--memory-bounded", action="store_true", help="run in memory-bounded mode"
+    )
+    parser.add_argument(
+        "--max-bio-chars", type=int, default=None, help="per-bio size budget"
+    )
+    parser.add_argument(
+        "--run-id", type=int, default=None, help="run to work on before exiting"
+    )
+    args = parser.parse_args()
+    start_local_workers(
+        args.queue_path,
+        args.num_workers,
+        args.memory_bounded,
+        args.max_bio_chars,
+        args.run_id,
+    )
@@ -1,25 +1,45 @@
 import os
+import sys
+import time
 import codecs
 import numpy as np
+import pandas as pd
 from datetime import datetime
 from flair.data import Sentence
 from flair.nn import Classifier
+from index_extractions import ExpertSearchIndex
+from distribute_extractions import ExtractionWorkQueue, get_worker_id
 import warnings
+from itertools import islice
+
+try:
+    import resource
+except ImportError:
+    # resource module is not available on Windows, so peak memory is not reported there
+    resource = None
 
 warnings.simplefilter(action="ignore", category=FutureWarning)
 
 
 class ExtractBioEntities:
-    def __init__(self):
+    def __init__(self, memory_bounded=False, max_bio_chars=None):
         """Initialize variables for instance of extract_bio_entities class
 
         self.start_run (datetime): time program began running, used to calculate full runtime later
         self.tagger (SequenceTagger): Flair 'ner-large' sequence tagger model
         self.tlds (tuple): valid top-level domain names used for email address extraction
+        self.memory_bounded (bool): stream each bio through tokenization in chunks instead of reading it fully
+        self.max_bio_chars (int): only the first max_bio_chars characters of a bio are used for extractions
+
+        Args:
+            memory_bounded (bool, optional): run extractions in memory-bounded mode. Defaults to False.
+            max_bio_chars (int, optional): per-bio size budget in characters. Defaults to None (no limit).
         """
         self.start_run = datetime.now()
         self.tagger = Classifier.load("ner-large")
         self.tlds = tuple(self.get_tlds())
+        self.memory_bounded = memory_bounded
+        self.max_bio_chars = max_bio_chars
 
     def get_tlds(self):
         """Turns text file of valid top-level domain names into list of top-level domain name strings,
@@ -65,6 +85,42 @@ class ExtractBioEntities:
         Returns:
                 bio (str): faculty bio with all variations of "." in email address replaced
         """
+        for i in self.get_dot_variations():
+            bio = bio.replace(i, ".")
+
+        return bio
+
+    def replace_ats(self, bio):
+        """Often, faculty members will purposefully obscure their email addresses to avoid spam. Their strategy often
+        involves replacing the "@" symbol in the email address with either the "@" symbol or the spelled-out word "at"
+        surrounded by additional spacing and/or special characters. This function finds all instances of these variations
+        in "@" and removes special characters, additional spacing, and changes "at" to "@".
+
+        Note that while it will replace the word "at" with the "@" symbol and merge the words that occured before and after,
+        this will not affect the email entity extraction because it primarily depends on the existence of a "." followed by a valid
+        top-level domain, not the "@" symbol. Additionally, this function will not replace "at" as a substring within words
+        if it occurs. For example, "kathryn -at- gmail.com" will NOT be changed to "k@hryn@gmail.com", but rather to
+        "kathryn@gmail.com", which is what we expect for an email address.
+
+        Args:
+                bio (str): text file of an individual faculty bio converted to string using UTF-8 encoding
+
+        Returns:
+                bio (str): faculty bio with all variations of "@" in email address replaced
+        """
+        for i in self.get_at_variations():
+            bio = bio.replace(i, "@")
+
+        return bio
+
+    def get_dot_variations(self):
+        """Lists the variations of the "." symbol that faculty members use to obscure the domain of their email address,
+        in the order they are replaced by replace_dots(). Padded variations come first so that the surrounding spacing is
+        removed along with the special characters.
+
+        Returns:
+            str_to_replace (list): strings that replace_dots() changes to "."
+        """
         dots = [
             ' "dot" ',
             " (dot) ",
@@ -91,28 +147,16 @@ class ExtractBioEntities:
         ]
         stripped_dots = [s.strip() for s in dots]
         str_to_replace = dots + stripped_dots + [" dot ", " ."]
-        for i in str_to_replace:
-            bio = bio.replace(i, ".")
-
-        return bio
-
-    def replace_ats(self, bio):
-        """Often, faculty members will purposefully obscure their email addresses to avoid spam. Their strategy often
-        involves replacing the "@" symbol in the email address with either the "@" symbol or the spelled-out word "at"
-        surrounded by additional spacing and/or special characters. This function finds all instances of these variations
-        in "@" and removes special characters, additional spacing, and changes "at" to "@".
 
-        Note that while it will replace the word "at" with the "@" symbol and merge the words that occured before and after,
-        this will not affect the email entity extraction because it primarily depends on the existence of a "." followed by a valid
-        top-level domain, not the "@" symbol. Additionally, this function will not replace "at" as a substring within words
-        if it occurs. For example, "kathryn -at- gmail.com" will NOT be changed to "k@hryn@gmail.com", but rather to
-        "kathryn@gmail.com", which is what we expect for an email address.
+        return str_to_replace
 
-        Args:
-                bio (str): text file of an individual faculty bio converted to string using UTF-8 encoding
+    def get_at_variations(self):
+        """Lists the variations of the "@" symbol that faculty members use to obscure their email address, in the order
+        they are replaced by replace_ats(). Padded variations come first so that the surrounding spacing is removed along
+        with the special characters.
 
         Returns:
-                bio (str): faculty bio with all variations of "@" in email address replaced
+            str_to_replace (list): strings that replace_ats() changes to "@"
         """
         ats = [
             ' "at" ',
@@ -140,10 +184,113 @@ class ExtractBioEntities:
         ]
         stripped_ats = [s.strip() for s in ats]
         str_to_replace = ats + stripped_ats + [" at ", " @ "]
-        for i in str_to_replace:
-            bio = bio.replace(i, "@")
 
-        return bio
+        return str_to_replace
+
+    def find_chunk_split(self, text):
+        """Finds the last position in text where it can be split into chunks that are cleaned separately by
+        clean_bio_for_names() and clean_bio_for_emails() with the same result as cleaning the full text. The split is
+        between two ASCII letters/digits that cannot both be part of an "@" or "." variation (i.e., not "do", "ot", or
+        "at"), so no variation replaced by replace_ats() or replace_dots() can cross it, and the word at the split
+        continues in the next chunk.
+
+        Args:
+            text (str): raw faculty bio text read so far
+
+        Returns:
+            int: position to split text at, or 0 if text has no such position
+        """
+        for i in range(len(text) - 1, 0, -1):
+            pair = text[i - 1 : i + 1]
+            if (
+                pair.isascii()
+                and pair.isalnum()
+                and pair.lower() not in ("do", "ot", "at")
+            ):
+                return i
+
+        return 0
+
+    def iter_bio_chunks(self, file_path, chunk_size=8192):
+        """Reads a faculty bio text file as string with UTF-8 encoding in chunks of about chunk_size characters, split
+        using find_chunk_split(). Leading and trailing whitespace of the bio is removed, as in clean_bio_for_names() and
+        clean_bio_for_emails(). Stops reading after self.max_bio_chars characters if it is set.
+
+        Args:
+            file_path (str): filepath of faculty bio text file
+            chunk_size (int, optional): number of characters to read at a time. Defaults to 8192.
+
+        Yields:
+            str: next chunk of raw faculty bio text
+        """
+        buffer = ""
+        chars_read = 0
+        with codecs.open(file_path, encoding="utf-8", errors="ignore") as f:
+            while True:
+                text = f.read(chunk_size)
+                if self.max_bio_chars and chars_read + len(text) > self.max_bio_chars:
+                    text = text[: self.max_bio_chars - chars_read]
+                    print("Faculty bio exceeds max_bio_chars, truncated: ", file_path)
+                chars_read += len(text)
+
+                # remove leading whitespace of bio until its first word has been read
+                buffer = buffer + text if buffer else text.lstrip()
+                if not text or chars_read == self.max_bio_chars:
+                    break
+
+                split = self.find_chunk_split(buffer)
+                if split:
+                    yield buffer[:split]
+                    buffer = buffer[split:]
+
+        buffer = buffer.rstrip()
+        if buffer:
+            yield buffer
+
+    def iter_bio_tokens(self, file_path, for_emails=False):
+        """Memory-bounded version of clean_bio_for_names() and clean_bio_for_emails(). Streams a faculty bio text file
+        through cleaning and tokenization one chunk at a time, yielding the same words as the list from
+        clean_bio_for_names() (or the words of the string from clean_bio_for_emails() if for_emails is True) without
+        keeping a full copy of the bio or its list of words in memory.
+
+        Args:
+            file_path (str): filepath of faculty bio text file
+            for_emails (bool, optional): also replace "@" and "." variations for email address extraction. Defaults to False.
+
+        Yields:
+            str: next cleaned word (token) in faculty bio
+        """
+        partial_token = ""
+        for chunk in self.iter_bio_chunks(file_path):
+            cleaned_chunk = chunk.lower()
+            if for_emails:
+                cleaned_chunk = self.replace_ats(cleaned_chunk)
+                cleaned_chunk = self.replace_dots(cleaned_chunk)
+
+            # last word of a chunk may continue in the next chunk
+            text = partial_token + cleaned_chunk
+            tokens = text.split()
+            partial_token = tokens.pop() if tokens and not text[-1].isspace() else ""
+            yield from tokens
+
+        if partial_token:
+            yield partial_token
+
+    def get_peak_memory(self):
+        """Gets the peak resident set size (RSS) of the current process.
+
+        Returns:
+            float: peak memory usage in MB, or None if it cannot be measured on this operating system
+        """
+        if resource is None:
+            return None
+
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            # macOS reports bytes, Linux reports kilobytes
+            peak_rss = peak_rss / 1024
+
+        return peak_rss / 1024
 
     def clean_bio_for_names(self, bio):
         """Perform data cleaning on raw bio text by removing all leading and trailing whitespace, and then converting all
@@ -185,24 +332,27 @@ class ExtractBioEntities:
         not be recognized properly if split across intervals. Implements a "look back"/overlap across intervals in case name
         would be split when using non-overlapping intervals.
 
+        Words are taken from bio_lst one interval at a time, so in memory-bounded mode bio_lst can be an iterator of words
+        from iter_bio_tokens() and words after the interval containing the name are never read.
+
         Args:
-            bio_lst (list): list of words created from cleaned text of individual faculty bio
+            bio_lst (list/iterator): list of words created from cleaned text of individual faculty bio
 
         Returns:
             name_found (str): if name in bio according to find_name(), returns string value of name; else returns empty string
         """
         name_found = ""  # empty strings evaluate to False
-        start = 0
         interval_range = 20
         overlap = 4
+        bio_iter = iter(bio_lst)
+        interval = list(islice(bio_iter, interval_range))
 
         # while no name has been found and more words are left to evaluate, send intervals of bio to find_name function for NER
-        while start < len(bio_lst) and not name_found:
-            end = start + interval_range
-            if end > len(bio_lst):
-                end = len(bio_lst)
-            name_found = self.find_name(bio_lst[start:end])
-            start += interval_range - overlap
+        while interval and not name_found:
+            name_found = self.find_name(interval)
+            interval = interval[interval_range - overlap :] + list(
+                islice(bio_iter, interval_range - overlap)
+            )
 
         return name_found
 
@@ -224,12 +374,17 @@ class ExtractBioEntities:
         self.tagger.predict(ner_predictions)
 
         # return first instance of token labeled as a person entity
+        name_found = ""
         for label in ner_predictions.get_labels():
             if label.value == "PER":
-                return label.data_point.text
+                name_found = label.data_point.text
+                break
+
+        # free embeddings Flair may keep on the sentence so they are not held until the next prediction
+        ner_predictions.clear_embeddings()
 
         # if no token is labeled as a person entity, return empty string, which evaluates to False
-        return ""
+        return name_found
 
     def clean_email(self, email_address):
         """Often, faculty members will purposefully obscure their email addresses to avoid spam. Their strategy sometimes
@@ -287,6 +442,23 @@ class ExtractBioEntities:
 
         return cleaned_name
 
+    def iter_token_windows(self, tokens):
+        """Yields each token of a bio, starting with the third token, together with the two tokens before it. Only the
+        current three tokens are kept, so tokens can be an iterator that never holds the full bio.
+
+        Args:
+            tokens (list/iterator): words (tokens) in cleaned faculty bio
+
+        Yields:
+            tuple: (prev2_token, prev_token, token)
+        """
+        tokens = iter(tokens)
+        prev2_token = next(tokens, None)
+        prev_token = next(tokens, None)
+        for token in tokens:
+            yield prev2_token, prev_token, token
+            prev2_token, prev_token = prev_token, token
+
     def extract_emails(self, bio, name):
         """Splits faculty bio on all whitespace characters, creating list of words (tokens) in bio. Performs email address
         entity extraction finding the first instance where a token ends in a valid top-level domain name. Then uses
@@ -295,21 +467,20 @@ class ExtractBioEntities:
 
         Returns only first instance of a found email address. If no email address is found, will return empty string.
 
+        In memory-bounded mode, bio is instead an iterator of cleaned tokens from iter_bio_tokens(), so the bio is never
+        split into a full list of tokens.
+
         Args:
-            bio (str): cleaned text of individual faculty bio
+            bio (str/iterator): cleaned text of individual faculty bio, or iterator of its cleaned tokens
             name (str): name of faculty member extracted from bio using extract_names() function
 
         Returns:
             str: if email address in bio, returns string value of first email address found; else returns empty string
         """
-        tokenized_bio = bio.split()
+        tokenized_bio = bio.split() if isinstance(bio, str) else bio
         name = self.clean_name_for_email(name)
 
-        for i in range(2, len(tokenized_bio)):
-            token = tokenized_bio[i]
-            prev_token = tokenized_bio[i - 1]
-            prev2_token = tokenized_bio[i - 2]
-
+        for prev2_token, prev_token, token in self.iter_token_windows(tokenized_bio):
             res = str(token).endswith(self.tlds)
 
             if res == True:
@@ -336,6 +507,394 @@ class ExtractBioEntities:
 
         return ""
 
+    def load_bios(self, bios_path, bios_to_run):
+        """Reads faculty bio text files into a single pandas string column so that cleaning and email address extraction
+        can be performed on all bios at once with vectorized string operations.
+
+        Args:
+            bios_path (str): path to folder with faculty bio text files
+            bios_to_run (iterable): faculty bio ID numbers to read
+
+        Returns:
+            bios (Series): faculty bio strings read with UTF-8 encoding, indexed by faculty bio ID
+        """
+        bios = {}
+        for i in bios_to_run:
+            file_path = os.path.join(bios_path, str(i) + ".txt")
+            with codecs.open(file_path, encoding="utf-8", errors="ignore") as f:
+                bios[i] = f.read()
+
+        return pd.Series(bios, dtype=object)
+
+    def clean_bios_for_emails_batch(self, bios):
+        """Batch version of clean_bio_for_emails(). Strips, lowercases, and replaces the "@" and "." variations in every
+        bio of the column at once, in the same order as replace_ats() and replace_dots().
+
+        Args:
+            bios (Series): raw faculty bio strings
+
+        Returns:
+            cleaned_bios (Series): cleaned faculty bio strings ready for email address extraction
+        """
+        cleaned_bios = bios.str.strip().str.lower()
+        for i in self.get_at_variations():
+            cleaned_bios = cleaned_bios.str.replace(i, "@", regex=False)
+        for i in self.get_dot_variations():
+            cleaned_bios = cleaned_bios.str.replace(i, ".", regex=False)
+
+        return cleaned_bios
+
+    def clean_emails_batch(self, email_addresses):
+        """Batch version of clean_email(). Discards repeated "@" symbols and removes a special character wrapping either
+        end of the recipient name for every email address in the column at once. Email addresses whose recipient name is
+        empty, or only a single special character, become empty strings.
+
+        Args:
+            email_addresses (Series): email addresses found by extract_emails_batch()
+
+        Returns:
+            cleaned_email_addresses (Series): email addresses in the same format as returned by clean_email()
+        """
+        char_to_replace = r'[<>{}\[\]()"]'
+        email_parts = email_addresses.str.split("@")
+        recipient_names = email_parts.str[0]
+        domain_names = email_parts.str[-1]
+
+        stripped_start = recipient_names.str.replace(
+            "^" + char_to_replace, "", regex=True
+        )
+        stripped_both = stripped_start.str.replace(
+            char_to_replace + r"\Z", "", regex=True
+        )
+        cleaned_email_addresses = stripped_both + "@" + domain_names
+
+        # clean_email() fails on these recipient names, example from bio no. 3033: recipient_name = ')'
+        cleaned_email_addresses[(recipient_names == "") | (stripped_start == "")] = ""
+
+        return cleaned_email_addresses
+
+    def extract_emails_batch(self, bios, names):
+        """Batch version of clean_bio_for_emails() and extract_emails(). Cleans all bios at once, splits them into one
+        long column of tokens, and finds tokens ending in a valid top-level domain name using a set lookup instead of
+        checking each bio's tokens in a loop. The extract_emails() conditionals are then evaluated on the candidate tokens
+        and their two prior tokens as column operations, and the first email address found in each bio is cleaned with
+        clean_emails_batch(). Results are identical to running extract_emails() on each bio.
+
+        Args:
+            bios (Series/list): raw faculty bio strings
+            names (Series/list): names of faculty members extracted from bios, in the same order as bios
+
+        Returns:
+            email_addresses (list): first email address found in each bio, or empty string if none was found
+        """
+        bios = pd.Series(list(bios), dtype=object)
+        names = pd.Series(list(names), dtype=object).fillna("")
+        names = names.str.replace(" ", "", regex=False).str.replace(
+            ".", "", regex=False
+        )
+
+        # one row per token, indexed by position of its bio in bios
+        tokens = self.clean_bios_for_emails_batch(bios).str.split().explode().dropna()
+        position = tokens.groupby(level=0).cumcount().to_numpy()
+        prev_tokens = tokens.shift(1)
+        prev2_tokens = tokens.shift(2)
+
+        # token.endswith(self.tlds) is true when the label after its last "." (ignoring one trailing ".") is a tld
+        tld_labels = set(tld.strip(".") for tld in self.tlds)
+        labels = tokens.str.extract(r"\.([^.]*)\.?\Z", expand=False)
+        is_candidate = (position >= 2) & labels.isin(tld_labels).to_numpy()
+
+        candidates = pd.DataFrame(
+            {
+                "token": tokens[is_candidate],
+                "prev_token": prev_tokens[is_candidate],
+                "prev2_token": prev2_tokens[is_candidate],
+            }
+        )
+        candidates["name"] = names.reindex(candidates.index).to_numpy()
+        token = candidates["token"]
+        prev_token = candidates["prev_token"]
+        prev2_token = candidates["prev2_token"]
+
+        # same conditionals, in the same order, as extract_emails()
+        is_url = token.str.contains("http", regex=False)
+        conditions = [
+            prev_token.eq("@") | prev_token.str.startswith("@"),
+            prev_token.str.contains("@", regex=False) | token.str.startswith("@"),
+            token.str.contains("@", regex=False),
+            pd.Series(
+                [p in n for p, n in zip(prev_token, candidates["name"])],
+                index=candidates.index,
+                dtype=bool,
+            ),
+        ]
+        choices = [
+            prev2_token + prev_token + token,
+            prev_token + token,
+            token,
+            prev_token + "@" + token,
+        ]
+        is_email = ~is_url & np.logical_or.reduce(conditions)
+        found = pd.Series(
+            np.select(conditions, choices, default=""), index=candidates.index
+        )[is_email.to_numpy()]
+
+        # keep only the first email address found in each bio
+        found = found[~found.index.duplicated(keep="first")]
+
+        email_addresses = pd.Series("", index=bios.index, dtype=object)
+        email_addresses[found.index] = self.clean_emails_batch(found).to_numpy()
+
+        return email_addresses.to_list()
+
+    def flag_email_defects(self, email_addresses):
+        """Checks every email address in a column at once for the quality problems previously inspected by hand with the
+        OpenRefine operation history in email_quality_openrefine_history.json, plus syntax, top-level domain, and
+        recipient/domain plausibility checks. Blank email addresses (no email address found) are only counted as
+        missing_email and are never flagged with a defect.
+
+        Args:
+            email_addresses (Series): extracted faculty email addresses
+
+        Returns:
+            defects (DataFrame): one row per email address, one True/False column per quality check
+        """
+        # special character lists match the OpenRefine quality metrics, except that a domain name ending in "." is
+        # now also a defect (example: "name@cs.uiuc.edu." from an email address at the end of a sentence)
+        recipient_special_char = r"[\[@_!#$%^&*()<>?/|}{~:\].+-]"
+        domain_edge_special_char = r"[\[@_!#$%^&*()<>?/|}{~:\].+-]"
+        domain_special_char = r"[\[@_!#$%^&*()<>?/|}{~:\]+]"
+        email_syntax = r"[a-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[a-z0-9!#$%&'*+/=?^_`{|}~-]+)*@(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z0-9-]+"
+
+        email_addresses = email_addresses.fillna("").astype(object)
+        email_parts = email_addresses.str.split("@")
+        recipient_names = email_parts.str[0]
+        domain_names = email_parts.str[-1]
+        domain_labels = domain_names.str.split(".")
+        tld_labels = set(tld.strip(".") for tld in self.tlds)
+
+        has_email = email_addresses != ""
+        defects = pd.DataFrame(index=email_addresses.index)
+        defects["missing_email"] = ~has_email
+        defects["email_missing_at"] = ~email_addresses.str.contains("@", regex=False)
+        defects["email_multiple_at"] = email_addresses.str.count("@") > 1
+        defects["recipient_starts_special_char"] = recipient_names.str.match(
+            recipient_special_char
+        )
+        defects["recipient_ends_special_char"] = recipient_names.str.contains(
+            recipient_special_char + r"\Z"
+        )
+        defects["domain_contains_special_char"] = domain_names.str.contains(
+            domain_special_char
+        )
+        defects["domain_starts_special_char"] = domain_names.str.match(
+            domain_edge_special_char
+        )
+        defects["domain_ends_special_char"] = domain_names.str.contains(
+            domain_edge_special_char + r"\Z"
+        )
+        defects["domain_missing_period"] = ~domain_names.str.contains(".", regex=False)
+
+        # runs of "." and "." next to "@" are left unfixed by fix_email_defects() because there is no single correct
+        # address (example: "b.....@ee.washington.edu" is redacted, not "b@ee.washington.edu")
+        defects["email_consecutive_periods"] = email_addresses.str.contains(
+            "..", regex=False
+        )
+        defects["email_period_next_to_at"] = email_addresses.str.contains(r"\.@|@\.")
+        defects["invalid_syntax"] = ~email_addresses.str.fullmatch(email_syntax)
+        defects["invalid_tld"] = ~domain_labels.str[-1].isin(tld_labels)
+
+        # recipient names that are not a person: a single character (example: "a@b.sc" from "a b.sc.") or the
+        # institution itself (example: "illinois@illinois.edu" from "university of illinois at illinois.edu")
+        defects["implausible_recipient"] = (recipient_names.str.len() == 1) | (
+            (domain_labels.str.len() == 2) & (recipient_names == domain_labels.str[0])
+        )
+
+        # domain names that are academic degree abbreviations rather than an institution (example: "b.sc", "m.tech")
+        defects["implausible_domain"] = (domain_labels.str.len() == 2) & (
+            domain_labels.str[0].str.len() == 1
+        )
+
+        defects.loc[~has_email, defects.columns != "missing_email"] = False
+
+        return defects
+
+    def fix_email_defects(self, email_addresses):
+        """Fixes defects that have a single correct fix in every email address in a column at once: an "email:" or
+        "mailto:" prefix, punctuation left over from the end of the surrounding sentence, special characters wrapping the
+        recipient name (as in clean_email()), and repeated "@" symbols. Example: "name@cs.uiuc.edu." becomes
+        "name@cs.uiuc.edu" and "(kathryn)@gmail.com" becomes "kathryn@gmail.com". Runs of "." and "." next to "@" are
+        not fixed, only flagged by flag_email_defects().
+
+        Args:
+            email_addresses (Series): extracted faculty email addresses
+
+        Returns:
+            fixed_email_addresses (Series): email addresses with common defects fixed
+        """
+        fixed_email_addresses = email_addresses.fillna("").astype(object).str.strip()
+        fixed_email_addresses = fixed_email_addresses.str.replace(
+            r"\A[^@]*?(?:e-?mail|mailto):(?:\\x[0-9a-f]{2})*", "", regex=True
+        )
+        fixed_email_addresses = fixed_email_addresses.str.replace(
+            r"[\])}>\"'.,;:]+\Z", "", regex=True
+        )
+        fixed_email_addresses = fixed_email_addresses.str.replace(
+            r"@{2,}", "@", regex=True
+        )
+
+        # remove special characters wrapping both ends of the recipient name, before the "@"
+        wrapper_char = r"[<>{}\[\]()\"']"
+        fixed_email_addresses = fixed_email_addresses.str.replace(
+            r"\A" + wrapper_char + "+", "", regex=True
+        )
+        fixed_email_addresses = fixed_email_addresses.str.replace(
+            wrapper_char + "+(?=@)", "", regex=True
+        )
+
+        return fixed_email_addresses
+
+    def validate_emails(self, email_addresses, drop_invalid=False):
+        """Validation and normalization stage run on all extracted email addresses at once. Fixes common defects with
+        fix_email_defects(), then checks the fixed email addresses with flag_email_defects(). If drop_invalid is True,
+        email addresses that still have a defect are replaced with an empty string.
+
+        Args:
+            email_addresses (list): faculty email addresses extracted from faculty bios
+            drop_invalid (bool, optional): replace email addresses that still have a defect with an empty string. Defaults to False.
+
+        Returns:
+            validated_email_addresses (list): fixed (and optionally filtered) email addresses, same order as email_addresses
+            quality_report (dict): number of email addresses, number fixed, number dropped, and number of email addresses
+                with each defect before and after validation
+        """
+        email_addresses = pd.Series(list(email_addresses), dtype=object).fillna("")
+        defects_before = self.flag_email_defects(email_addresses)
+
+        validated_email_addresses = self.fix_email_defects(email_addresses)
+        defects_after = self.flag_email_defects(validated_email_addresses)
+        num_fixed = (validated_email_addresses != email_addresses).sum()
+
+        has_defect = defects_after.drop(columns="missing_email").any(axis=1)
+        num_dropped = 0
+        if drop_invalid:
+            validated_email_addresses[has_defect] = ""
+            num_dropped = has_defect.sum()
+
+        quality_report = {
+            "num_emails": int((email_addresses != "").sum()),
+            "num_fixed": int(num_fixed),
+            "num_dropped": int(num_dropped),
+            "defects_before": {k: int(v) for k, v in defects_before.sum().items()},
+            "defects_after": {k: int(v) for k, v in defects_after.sum().items()},
+        }
+
+        return validated_email_addresses.to_list(), quality_report
+
+    def extract_bio(self, bios_path, bio_id):
+        """Reads a faculty bio text file as string with UTF-8 encoding and performs name and email address entity
+        extraction on it. Only the first self.max_bio_chars characters of the bio are used if it is set, in both the
+        default and memory-bounded modes.
+
+        Args:
+            bios_path (str): path to folder with faculty bio text files
+            bio_id (int): faculty bio ID number
+
+        Returns:
+            name (str): faculty name extracted from bio, or empty string if none was found
+            email_address (str): faculty email address extracted from bio, or empty string if none was found
+        """
+        file_path = os.path.join(bios_path, str(bio_id) + ".txt")
+        if self.memory_bounded:
+            # stream bio through cleaning and tokenization instead of reading it fully
+            name = self.extract_names(self.iter_bio_tokens(file_path))
+            email_address = self.extract_emails(
+                self.iter_bio_tokens(file_path, for_emails=True), name
+            )
+            return name, email_address
+
+        with codecs.open(file_path, encoding="utf-8", errors="ignore") as f:
+            bio = f.read()
+        if self.max_bio_chars and len(bio) > self.max_bio_chars:
+            bio = bio[: self.max_bio_chars]
+            print("Faculty bio exceeds max_bio_chars, truncated: ", file_path)
+
+        # run name extraction on cleaned bio instance
+        cleaned_bio_lst = self.clean_bio_for_names(bio)
+        name = self.extract_names(cleaned_bio_lst)
+
+        # run email address extraction on cleaned bio instance
+        cleaned_bio = self.clean_bio_for_emails(bio)
+        email_address = self.extract_emails(cleaned_bio, name)
+
+        return name, email_address
+
+    def run_worker(
+        self,
+        queue_path,
+        worker_id=None,
+        batch_size=10,
+        lease_seconds=600,
+        poll_seconds=5,
+        run_id=None,
+    ):
+        """Works on the shared work queue at queue_path until extractions have been performed on all faculty bios of a
+        run. Repeatedly claims a batch of faculty bios, performs entity extractions on them, and saves the results to
+        the queue. When no faculty bios can be claimed but other workers still hold leases, waits poll_seconds and tries
+        again, so faculty bios from workers that crashed are reclaimed once their lease expires. If extractions on a
+        faculty bio raise an error, the error is recorded in the queue and the worker moves on to the next faculty bio.
+
+        If run_id is not set, the worker works on the run it finds at startup, or on the next published run if the run
+        it finds is already finished (e.g. last night's queue), so workers can be started before or after the
+        coordinating process publishes the faculty bios.
+
+        Args:
+            queue_path (str): filepath of SQLite work queue on storage shared by all worker nodes
+            worker_id (str, optional): unique name of worker. Defaults to host name and process ID.
+            batch_size (int, optional): number of faculty bios to claim at a time. Defaults to 10.
+            lease_seconds (int, optional): seconds before a claimed batch can be reclaimed by other workers. Defaults to 600.
+            poll_seconds (int, optional): seconds to wait when no faculty bios can be claimed. Defaults to 5.
+            run_id (int, optional): ID of the run to work on, as returned by ExtractionWorkQueue.publish(). Defaults to None.
+
+        Returns:
+            None
+        """
+        bios_path, _, _ = self.get_file_paths("results")
+        queue = ExtractionWorkQueue(queue_path)
+        worker_id = worker_id or get_worker_id()
+
+        if run_id is None:
+            run_id, finished = queue.get_run_status()
+            if finished:
+                print(
+                    "Work queue is finished, waiting for next run. Worker: ", worker_id
+                )
+                run_id += 1
+
+        while True:
+            latest_run_id, finished = queue.get_run_status()
+            if latest_run_id >= run_id and finished:
+                break
+
+            batch = queue.claim_batch(worker_id, batch_size, lease_seconds)
+            if not batch:
+                time.sleep(poll_seconds)
+                continue
+
+            results = []
+            for position, i in batch:
+                print("Faculty Bio ID: ", i, "Worker: ", worker_id)
+                try:
+                    name, email_address = self.extract_bio(bios_path, i)
+                except Exception as e:
+                    print("Extractions failed on Faculty Bio ID: ", i, repr(e))
+                    queue.fail_task(worker_id, position, repr(e))
+                    continue
+                results.append((position, name, email_address))
+            queue.complete_batch(worker_id, results)
+
+        return None
+
     def get_file_paths(self, output_folder):
         """Gets extraction input folder name and output file names based on preferred output folder name.
         Compatible with all operating systems.
@@ -354,7 +913,15 @@ class ExtractBioEntities:
 
         return bios_path, name_path, email_path
 
-    def perform_extractions(self, seed=0, run_subset=False, output_folder="results"):
+    def perform_extractions(
+        self,
+        seed=0,
+        run_subset=False,
+        output_folder="results",
+        validate=True,
+        index_path=None,
+        queue_path=None,
+    ):
         """Performs name and email address entity extraction on the faculty bio text files found using the original
         ExpertSearch code base. This function runs an updated, more effective version of entity extraction compared
         to the entity extraction code from the original ExpertSearch code base.
@@ -362,10 +929,18 @@ class ExtractBioEntities:
         If run_subset is False, then all 6,524 faculty bio text files will be run. If run_subset is an integer, then
         only run_subset faculty bio text files will be run. This subset will be randomly selected according to seed.
 
+        If queue_path is set, the faculty bios are published to a shared work queue (see distribute_extractions.py) and
+        this process works on the queue alongside any workers started on other nodes with start_local_workers(). Once
+        all faculty bios are done, the results of all workers are merged and saved in the same order as a
+        single-machine run.
+
         Args:
             seed (int, optional): positive integer indicating random seed to use. Defaults to 0.
             run_subset (int/bool, optional): positive integer indicating number of results to retrieve. Defaults to False.
             output_folder (str, optional): folder name to save entity extraction results, must be in cwd. Defaults to "results".
+            validate (bool, optional): run validate_emails() on extracted email addresses before saving. Defaults to True.
+            index_path (str, optional): filepath of ExpertSearchIndex to incrementally update with results. Defaults to None.
+            queue_path (str, optional): filepath of SQLite work queue on shared storage for distributed mode. Defaults to None.
 
         Returns:
             names (list): faculty names extracted from faculty bios using new entity extraction methodology
@@ -384,31 +959,40 @@ class ExtractBioEntities:
         else:
             bios_to_run = range(total_bios - 1)
 
-        # initialize lists to store extracted entities
-        names = []
-        email_addresses = []
-
-        # for each faculty bio text file, read in as string with UTF-8 encoding and perform entity extractions
-        for i in bios_to_run:
-            print("Faculty Bio ID: ", i)
-            file_path = os.path.join(bios_path, str(i) + ".txt")
-            with codecs.open(file_path, encoding="utf-8", errors="ignore") as f:
-                bio = f.read()
-
-            # run name extraction on cleaned bio instance
-            cleaned_bio_lst = self.clean_bio_for_names(bio)
-            name = self.extract_names(cleaned_bio_lst)
-            names.append(name)
-
-            # run email address extraction on cleaned bio instance
-            cleaned_bio = self.clean_bio_for_emails(bio)
-            email_address = self.extract_emails(cleaned_bio, name)
-            email_addresses.append(email_address)
+        if queue_path:
+            # publish bios to shared work queue, work on it until all bios are done, then merge all workers' results
+            queue = ExtractionWorkQueue(queue_path)
+            run_id = queue.publish(bios_to_run)
+            self.run_worker(queue_path, run_id=run_id)
+            bios_to_run, names, email_addresses = queue.get_results()
+        else:
+            # initialize lists to store extracted entities
+            names = []
+            email_addresses = []
+
+            # for each faculty bio, perform entity extractions
+            for i in bios_to_run:
+                print("Faculty Bio ID: ", i)
+                name, email_address = self.extract_bio(bios_path, i)
+                names.append(name)
+                email_addresses.append(email_address)
+
+        # fix common email address defects and report email address quality
+        if validate:
+            email_addresses, quality_report = self.validate_emails(email_addresses)
+            print("Email address quality report: ", quality_report)
 
         self.save_extractions(name_path, names, email_path, email_addresses)
 
+        # add new extraction results to inverted index for expert lookup
+        if index_path:
+            ExpertSearchIndex(index_path).update_index(
+                bios_to_run, names, email_addresses
+            )
+
         end_run = datetime.now()
         print("Entity extraction runtime: ", str(end_run - self.start_run))
+        print("Peak memory usage (MB): ", self.get_peak_memory())
 
         return names, email_addresses
 
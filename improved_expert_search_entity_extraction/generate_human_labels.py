@@ -1,10 +1,20 @@
 import os
+import re
+import sys
+import csv
 import codecs
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 
-def get_human_generated_labels(seed, num_to_run, demo=False):
+def get_human_generated_labels(
+    seed,
+    num_to_run,
+    demo=False,
+    fast=False,
+    labels_path=os.path.join("test_results", "fast_user_generated_labels.csv"),
+):
     """Randomly selects a subset of faculty bios to retrieve for human evaluation. Prints faculty bio text to command line for
     user to manually evaluate. Prompts user to indicate if bio contains a name ("1" = yes, "0" = no), then prompts user to
     indicate if bio contains an email address ("1" = yes, "0" = no).
@@ -17,6 +27,9 @@ def get_human_generated_labels(seed, num_to_run, demo=False):
         seed (int): positive integer indicating random seed to run
         num_to_run (int): positive integer indicating number of faculty bios to retrieve for human evaluation
         demo (bool): indicates if demo is being run for peer-review purposes
+        fast (bool): use get_fast_human_generated_labels() instead of printing each full bio. Raises a RuntimeError if
+            the user quits before all num_to_run bios are labeled; call again to resume. Defaults to False.
+        labels_path (str, optional): csv file fast labels are saved to. Defaults to "test_results/fast_user_generated_labels.csv".
 
     Returns:
         bios_to_run (list): faculty bio numbers that were evaluated
@@ -33,6 +46,19 @@ def get_human_generated_labels(seed, num_to_run, demo=False):
         has_name = labels_df["Has_Name"].to_list()[:num_to_run]
         has_email = labels_df["Has_Email"].to_list()[:num_to_run]
 
+    elif fast:
+        bios_to_run, has_name, has_email = get_fast_human_generated_labels(
+            seed, num_to_run, labels_path=labels_path
+        )
+        if len(bios_to_run) < num_to_run:
+            raise RuntimeError(
+                "Labeled "
+                + str(len(bios_to_run))
+                + " of "
+                + str(num_to_run)
+                + " faculty bios, run again to resume labeling"
+            )
+
     else:
         # set random seed and select subset of faculty bio numbers to evaluate
         np.random.seed(seed)
@@ -78,3 +104,274 @@ def get_human_generated_labels(seed, num_to_run, demo=False):
         human_generated_labels.to_csv("test_results/user_generated_labels.csv")
 
     return bios_to_run, has_name, has_email
+
+
+def get_keypress(valid_keys):
+    """Reads a single keystroke from the command line without waiting for the user to press enter. Falls back to
+    reading a full line when input is not an interactive terminal (e.g. piped input).
+
+    Args:
+        valid_keys (str): keys to accept; any other key is ignored
+
+    Returns:
+        key (str): the key the user pressed
+    """
+    while True:
+        if not sys.stdin.isatty():
+            key = sys.stdin.readline().strip()[:1]
+            if not key:
+                # end of piped input, treat as quitting the session
+                return "q"
+        elif os.name == "nt":
+            import msvcrt
+
+            key = msvcrt.getwch()
+        else:
+            import tty
+            import termios
+
+            file_descriptor = sys.stdin.fileno()
+            old_settings = termios.tcgetattr(file_descriptor)
+            try:
+                tty.setraw(file_descriptor)
+                key = sys.stdin.read(1)
+            finally:
+                termios.tcsetattr(file_descriptor, termios.TCSADRAIN, old_settings)
+
+        key = key.lower()
+        if key == "\x03":
+            raise KeyboardInterrupt
+        if key in valid_keys:
+            print(key)
+            return key
+
+
+def get_candidate_snippets(bio, entity, is_email, context_chars=80, max_snippets=3):
+    """Finds short snippets of a faculty bio around the model's extraction hit so the user can label the bio without
+    reading the full text. Whitespace in the bio is collapsed and the hit is highlighted. The name hit is searched for
+    as extracted. The email address hit is searched for by its recipient name, since obscured email addresses (e.g.
+    "yap(at)cs(dot)nyu(dot)edu") do not appear in the bio as extracted. If the model found nothing, or its hit does
+    not appear in the bio, snippets are taken around common email address cues ("@", "at", "email") for email
+    addresses and around the start of the bio for names (names usually appear in the first 20 words).
+
+    Args:
+        bio (str): text file of an individual faculty bio converted to string using UTF-8 encoding
+        entity (str): name or email address extracted from the bio by the model, or empty string if none was found
+        is_email (bool): entity is an email address
+        context_chars (int, optional): characters of context to show on each side of a hit. Defaults to 80.
+        max_snippets (int, optional): maximum number of snippets to return. Defaults to 3.
+
+    Returns:
+        snippets (list): snippet strings with hits highlighted
+    """
+    bio = " ".join(bio.split())
+    bio_lower = bio.lower()
+
+    # skip empty hits (e.g. "@-gmail.com" has no recipient name), which would match everywhere
+    hit = entity.split("@")[0] if is_email else entity
+    hit = hit.strip().lower()
+    patterns = [re.escape(hit)] if hit else []
+    if is_email:
+        patterns.append(r"@|\bat\b|e-?mail")
+
+    for pattern in patterns:
+        snippets = []
+        for match in re.finditer(pattern, bio_lower):
+            start = max(match.start() - context_chars, 0)
+            end = min(match.end() + context_chars, len(bio))
+            snippets.append(
+                bio[start : match.start()]
+                + "\033[7m"
+                + bio[match.start() : match.end()]
+                + "\033[0m"
+                + bio[match.end() : end]
+            )
+            if len(snippets) == max_snippets:
+                break
+        if snippets:
+            return snippets
+
+    return [bio[: 2 * context_chars]] if bio else []
+
+
+def prepare_bio_for_labeling(bios_path, bio_num, names, email_addresses):
+    """Reads a faculty bio and precomputes the candidate snippets shown to the user for its name and email address.
+
+    Args:
+        bios_path (str): path to folder with faculty bio text files
+        bio_num (int): faculty bio ID number
+        names (list): names extracted by the model, where the list index is the faculty bio ID
+        email_addresses (list): email addresses extracted by the model, where the list index is the faculty bio ID
+
+    Returns:
+        bio_labeling_info (dict): faculty bio text, model's name and email address hits, and their candidate snippets
+    """
+    file_path = os.path.join(bios_path, str(bio_num) + ".txt")
+    with codecs.open(file_path, encoding="utf-8", errors="ignore") as f:
+        bio = f.read()
+
+    name = names[bio_num] if bio_num < len(names) else ""
+    email_address = email_addresses[bio_num] if bio_num < len(email_addresses) else ""
+
+    bio_labeling_info = {
+        "bio": bio,
+        "name": name,
+        "email_address": email_address,
+        "name_snippets": get_candidate_snippets(bio, name, is_email=False),
+        "email_snippets": get_candidate_snippets(bio, email_address, is_email=True),
+    }
+
+    return bio_labeling_info
+
+
+def ask_for_label(bio_labeling_info, entity_type):
+    """Shows the model's hit and candidate snippets for one entity type and asks the user for a single-keystroke
+    label: "1" if the bio has the entity, "0" if it does not, "f" to show the full bio first, or "q" to quit.
+
+    Args:
+        bio_labeling_info (dict): output of prepare_bio_for_labeling()
+        entity_type (str): "name" or "email"
+
+    Returns:
+        key (str): "1", "0", or "q"
+    """
+    entity = (
+        bio_labeling_info["name"]
+        if entity_type == "name"
+        else bio_labeling_info["email_address"]
+    )
+    print("Model " + entity_type + ": " + (entity if entity else "(none found)"))
+    for snippet in bio_labeling_info[entity_type + "_snippets"]:
+        print("    ..." + snippet + "...")
+
+    while True:
+        article = "an " if entity_type[0] in "aeiou" else "a "
+        print(
+            "Does bio have "
+            + article
+            + entity_type
+            + "? [1] yes [0] no [f] full bio [q] quit: ",
+            end="",
+            flush=True,
+        )
+        key = get_keypress("10fq")
+        if key != "f":
+            return key
+        print(bio_labeling_info["bio"])
+
+
+def get_fast_human_generated_labels(
+    seed,
+    num_to_run,
+    labels_path=os.path.join("test_results", "fast_user_generated_labels.csv"),
+    results_folder="results",
+    num_to_prefetch=5,
+):
+    """High-throughput version of the manual evaluation in get_human_generated_labels(). Selects the same faculty bios
+    for the same seed and num_to_run, but instead of printing each full bio, shows only candidate snippets around the
+    name and email address found by the model in results_folder (from a full perform_extractions() run) and takes
+    single-keystroke answers.
+
+    Each bio's labels are appended to labels_path as soon as they are given, so no answers are lost if the program
+    crashes, and running the function again with the same seed and num_to_run resumes after the last labeled bio.
+    Press "q" to stop a session early. The next num_to_prefetch bios are read and their snippets prepared in the
+    background while the user labels the current bio.
+
+    Args:
+        seed (int): positive integer indicating random seed to run
+        num_to_run (int): positive integer indicating number of faculty bios to retrieve for human evaluation
+        labels_path (str, optional): csv file to save labels to. Defaults to "test_results/fast_user_generated_labels.csv".
+        results_folder (str, optional): folder with NEW_names.txt and NEW_emails.txt from a full run. Defaults to "results".
+        num_to_prefetch (int, optional): number of upcoming faculty bios to prepare in the background. Defaults to 5.
+
+    Returns:
+        bios_to_run (list): faculty bio numbers that were evaluated so far, in order
+        has_name (list): 1s/0s (human-generated labels) indicating whether bio has/does not have a name. Order corresponds to bios_to_run.
+        has_email (list): 1s/0s (human-generated labels) indicating whether bio has/does not have an email address. Order corresponds to bios_to_run.
+    """
+    # set random seed and select subset of faculty bio numbers to evaluate, same as get_human_generated_labels()
+    np.random.seed(seed)
+    all_bios_to_run = np.random.choice(6524, num_to_run).tolist()
+
+    # resume from labels saved by a previous session with the same seed and num_to_run
+    bios_to_run, has_name, has_email = [], [], []
+    if os.path.exists(labels_path):
+        labels_df = pd.read_csv(labels_path)
+        bios_to_run = labels_df["Bio_Num"].to_list()
+        has_name = labels_df["Has_Name"].to_list()
+        has_email = labels_df["Has_Email"].to_list()
+        if bios_to_run != all_bios_to_run[: len(bios_to_run)]:
+            raise ValueError(
+                labels_path
+                + " holds labels for a different seed or num_to_run, use a different labels_path"
+            )
+    else:
+        with open(labels_path, "w", newline="") as f:
+            csv.writer(f).writerow(["Bio_Num", "Has_Name", "Has_Email"])
+
+    # load model's extraction hits used for candidate snippets
+    bios_path = os.path.join("data", "compiled_bios")
+    with codecs.open(
+        os.path.join(results_folder, "NEW_names.txt"), encoding="utf-8", errors="ignore"
+    ) as f:
+        names = f.read().split("\n")
+    with codecs.open(
+        os.path.join(results_folder, "NEW_emails.txt"),
+        encoding="utf-8",
+        errors="ignore",
+    ) as f:
+        email_addresses = f.read().split("\n")
+
+    bios_left = all_bios_to_run[len(bios_to_run) :]
+    print(
+        "Labeled",
+        len(bios_to_run),
+        "of",
+        num_to_run,
+        "faculty bios, press q to stop and resume later.",
+    )
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # prepare the first bios, then keep num_to_prefetch bios prepared ahead of the current one
+        prefetched = [
+            executor.submit(
+                prepare_bio_for_labeling, bios_path, i, names, email_addresses
+            )
+            for i in bios_left[: num_to_prefetch + 1]
+        ]
+        for position, i in enumerate(bios_left):
+            bio_labeling_info = prefetched[position].result()
+            if position + num_to_prefetch + 1 < len(bios_left):
+                prefetched.append(
+                    executor.submit(
+                        prepare_bio_for_labeling,
+                        bios_path,
+                        bios_left[position + num_to_prefetch + 1],
+                        names,
+                        email_addresses,
+                    )
+                )
+            prefetched[position] = None
+
+            print(
+                "\nFaculty Bio ID: ",
+                i,
+                "(" + str(len(bios_to_run) + 1),
+                "of",
+                str(num_to_run) + ")",
+            )
+            name_key = ask_for_label(bio_labeling_info, "name")
+            if name_key == "q":
+                break
+            email_key = ask_for_label(bio_labeling_info, "email")
+            if email_key == "q":
+                break
+
+            # save answers for this bio immediately so they survive a crash
+            with open(labels_path, "a", newline="") as f:
+                csv.writer(f).writerow([i, int(name_key), int(email_key)])
+            bios_to_run.append(i)
+            has_name.append(int(name_key))
+            has_email.append(int(email_key))
+
+    return bios_to_run, has_name, has_email
@@ -0,0 +1,301 @@
+import os
+import re
+import codecs
+import bisect
+import numpy as np
+
+
+class ExpertSearchIndex:
+    def __init__(self, index_path=os.path.join("results", "NEW_index.npz")):
+        """Initialize variables for instance of expert_search_index class. Loads the index saved at index_path if it exists.
+        The ".npz" suffix is added to index_path if it is missing, so the index is always saved and loaded at the same
+        filepath.
+
+        self.index_path (str): filepath of on-disk inverted index, ending in ".npz"
+        self.fields (tuple): names of indexed fields, used as prefix of every index key (example: "name:otte")
+        self.stopwords (set): words that are not indexed in university and department fields
+        self.postings (dict): index key -> set of faculty bio IDs containing that key
+        self.sorted_keys (list): sorted index keys used for prefix lookups, rebuilt after the index changes
+        """
+        if not index_path.endswith(".npz"):
+            index_path = index_path + ".npz"
+        self.index_path = index_path
+        self.fields = ("name", "domain", "uni", "dept")
+        self.stopwords = {"of", "at", "and", "the", "for", "in", "&", "de"}
+        self.postings = {}
+        self.sorted_keys = None
+
+        if os.path.exists(index_path):
+            self.load_index()
+
+    def tokenize_text(self, text):
+        """Normalizes a name, university, or department string into lowercase word tokens, removing punctuation.
+        Example: "Vikram S. Adve" becomes ["vikram", "s", "adve"].
+
+        Args:
+            text (str): extracted name, university, or department
+
+        Returns:
+            list: lowercase word tokens in text
+        """
+        return re.findall(r"[^\W_]+", text.lower())
+
+    def tokenize_domain(self, email_address):
+        """Gets the domain name of an email address and every parent domain with at least two labels, so that a faculty
+        member can be found by department or institution domain. Example: "akotte2@cs.illinois.edu" becomes
+        ["cs.illinois.edu", "illinois.edu"].
+
+        Args:
+            email_address (str): extracted faculty email address
+
+        Returns:
+            domains (list): domain name and parent domain names, or empty list if email address has no "@"
+        """
+        if "@" not in email_address:
+            return []
+
+        labels = email_address.lower().split("@")[-1].strip(".").split(".")
+        domains = [".".join(labels[i:]) for i in range(len(labels) - 1)]
+
+        return domains
+
+    def get_bio_keys(self, name, email_address, uni="", dept=""):
+        """Creates the set of index keys for one faculty bio. Each key is the field name and a normalized term joined
+        by ":" (example: "domain:illinois.edu").
+
+        Args:
+            name (str): faculty name extracted from bio
+            email_address (str): faculty email address extracted from bio
+            uni (str, optional): faculty university, if available. Defaults to "".
+            dept (str, optional): faculty department, if available. Defaults to "".
+
+        Returns:
+            keys (set): index keys for faculty bio
+        """
+        keys = set("name:" + token for token in self.tokenize_text(name))
+        keys.update(
+            "domain:" + domain for domain in self.tokenize_domain(email_address)
+        )
+        for field, text in [("uni", uni), ("dept", dept)]:
+            keys.update(
+                field + ":" + token
+                for token in self.tokenize_text(text)
+                if token not in self.stopwords
+            )
+
+        return keys
+
+    def remove_bios(self, bio_ids):
+        """Removes all index keys for the given faculty bios, e.g. before adding their new extraction results.
+
+        Args:
+            bio_ids (iterable): faculty bio ID numbers to remove
+
+        Returns:
+            None
+        """
+        bio_ids = set(int(i) for i in bio_ids)
+        for key in list(self.postings):
+            self.postings[key] -= bio_ids
+            if not self.postings[key]:
+                del self.postings[key]
+        self.sorted_keys = None
+
+        return None
+
+    def add_extractions(self, bio_ids, names, email_addresses, unis=None, depts=None):
+        """Adds extraction results to the index. Results for faculty bios that are already indexed replace the old
+        results, so the index can be updated incrementally as new extraction results arrive.
+
+        Args:
+            bio_ids (list): faculty bio ID numbers, in the same order as names and email_addresses
+            names (list): faculty names extracted from bios
+            email_addresses (list): faculty email addresses extracted from bios
+            unis (list, optional): faculty universities, same order as bio_ids. Defaults to None.
+            depts (list, optional): faculty departments, same order as bio_ids. Defaults to None.
+
+        Returns:
+            None
+        """
+        bio_ids = [int(i) for i in bio_ids]
+        unis = unis if unis is not None else [""] * len(bio_ids)
+        depts = depts if depts is not None else [""] * len(bio_ids)
+        self.remove_bios(bio_ids)
+
+        for bio_id, name, email_address, uni, dept in zip(
+            bio_ids, names, email_addresses, unis, depts
+        ):
+            for key in self.get_bio_keys(name, email_address, uni, dept):
+                self.postings.setdefault(key, set()).add(bio_id)
+        self.sorted_keys = None
+
+        return None
+
+    def read_extractions(self, file_path):
+        """Reads a text file of extraction results with one result per line in order of faculty bios.
+
+        Args:
+            file_path (str): filepath of extraction results (example: results/NEW_names.txt)
+
+        Returns:
+            list: extraction results, where the list index is the faculty bio ID
+        """
+        with codecs.open(file_path, encoding="utf-8", errors="ignore") as f:
+            return f.read().split("\n")
+
+    def build_index(self, output_folder="results"):
+        """Builds the index from scratch using the names and email addresses saved by a full run of perform_extractions()
+        in output_folder, and the university and department fields from the previous ExpertSearch extraction results.
+        Saves the index to self.index_path.
+
+        Args:
+            output_folder (str, optional): folder with NEW_names.txt and NEW_emails.txt from a full run. Defaults to "results".
+
+        Returns:
+            None
+        """
+        names = self.read_extractions(os.path.join(output_folder, "NEW_names.txt"))
+        email_addresses = self.read_extractions(
+            os.path.join(output_folder, "NEW_emails.txt")
+        )
+        prev_results_path = os.path.join("data", "previous_version_extraction_results")
+        unis = self.read_extractions(os.path.join(prev_results_path, "unis.txt"))
+        depts = self.read_extractions(os.path.join(prev_results_path, "depts.txt"))
+
+        # pad university and department fields so every faculty bio with a name or email address is indexed
+        num_bios = max(len(names), len(email_addresses))
+        names, email_addresses, unis, depts = [
+            (lst + [""] * num_bios)[:num_bios]
+            for lst in (names, email_addresses, unis, depts)
+        ]
+
+        self.postings = {}
+        self.add_extractions(range(num_bios), names, email_addresses, unis, depts)
+        self.save_index()
+
+        return None
+
+    def update_index(self, bio_ids, names, email_addresses):
+        """Incrementally updates the saved index with new extraction results (e.g. the results of a perform_extractions()
+        run on a subset of faculty bios) and saves it to self.index_path. University and department fields for the
+        faculty bios are read from the previous ExpertSearch extraction results.
+
+        Args:
+            bio_ids (list): faculty bio ID numbers, in the same order as names and email_addresses
+            names (list): faculty names extracted from bios
+            email_addresses (list): faculty email addresses extracted from bios
+
+        Returns:
+            None
+        """
+        prev_results_path = os.path.join("data", "previous_version_extraction_results")
+        unis = self.read_extractions(os.path.join(prev_results_path, "unis.txt"))
+        depts = self.read_extractions(os.path.join(prev_results_path, "depts.txt"))
+        bio_ids = [int(i) for i in bio_ids]
+
+        self.add_extractions(
+            bio_ids,
+            names,
+            email_addresses,
+            [unis[i] if i < len(unis) else "" for i in bio_ids],
+            [depts[i] if i < len(depts) else "" for i in bio_ids],
+        )
+        self.save_index()
+
+        return None
+
+    def save_index(self):
+        """Saves the index to self.index_path as a compressed numpy file with three arrays: the sorted index keys, the
+        offset of each key's postings, and all postings (faculty bio IDs) concatenated in key order.
+
+        Returns:
+            None
+        """
+        keys = sorted(self.postings)
+        postings = [sorted(self.postings[key]) for key in keys]
+        offsets = np.cumsum([0] + [len(p) for p in postings])
+        # save through a file handle so numpy saves to exactly self.index_path
+        with open(self.index_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                keys=np.array(keys, dtype=str),
+                offsets=offsets.astype(np.int64),
+                postings=np.array([i for p in postings for i in p], dtype=np.int32),
+            )
+
+        return None
+
+    def load_index(self):
+        """Loads the index saved at self.index_path by save_index().
+
+        Returns:
+            None
+        """
+        with np.load(self.index_path) as index_file:
+            keys = index_file["keys"].tolist()
+            offsets = index_file["offsets"].tolist()
+            postings = index_file["postings"].tolist()
+
+        self.postings = {
+            key: set(postings[offsets[i] : offsets[i + 1]])
+            for i, key in enumerate(keys)
+        }
+        self.sorted_keys = keys
+
+        return None
+
+    def lookup_key(self, key, prefix=False):
+        """Finds the faculty bios with an index key equal to key, or starting with key if prefix is True.
+
+        Args:
+            key (str): index key (example: "name:otte")
+            prefix (bool, optional): perform prefix lookup instead of exact lookup. Defaults to False.
+
+        Returns:
+            bio_ids (set): faculty bio ID numbers matching key
+        """
+        if not prefix:
+            return set(self.postings.get(key, ()))
+
+        if self.sorted_keys is None:
+            self.sorted_keys = sorted(self.postings)
+
+        bio_ids = set()
+        i = bisect.bisect_left(self.sorted_keys, key)
+        while i < len(self.sorted_keys) and self.sorted_keys[i].startswith(key):
+            bio_ids.update(self.postings[self.sorted_keys[i]])
+            i += 1
+
+        return bio_ids
+
+    def lookup(self, term, field="name", prefix=False):
+        """Finds the faculty bios whose field contains term. Name, university, and department terms are split into
+        words with tokenize_text(), the same way as indexed text, so lookup("O'Brien") finds bios indexed with "o" and
+        "brien", and lookup("Vikram S.") finds bios indexed with "vikram" and "s". A term with several words matches
+        faculty bios containing all of them. Email domain terms are only lowercased. With prefix=True, the last word
+        of term may be the start of an indexed word (example: lookup("ott", prefix=True) finds "otte" and
+        "ottenberg"), while all other words must match exactly.
+
+        Args:
+            term (str): name, email domain, university, or department words to look up
+            field (str, optional): one of self.fields. Defaults to "name".
+            prefix (bool, optional): perform prefix lookup on last word of term instead of exact lookup. Defaults to False.
+
+        Returns:
+            list: sorted faculty bio ID numbers matching term
+        """
+        if field not in self.fields:
+            raise ValueError("field must be one of " + ", ".join(self.fields))
+
+        if field == "domain":
+            words = [term.strip().lower()]
+        else:
+            words = self.tokenize_text(term)
+        if not words or not words[-1]:
+            return []
+
+        bio_ids = self.lookup_key(field + ":" + words[-1], prefix)
+        for word in words[:-1]:
+            bio_ids &= self.lookup_key(field + ":" + word)
+
+        return sorted(bio_ids)
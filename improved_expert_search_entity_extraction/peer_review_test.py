@@ -8,6 +8,20 @@ extraction_model = ExtractBioEntities()
 names, emails = extraction_model.perform_extractions()
 print("Entity Extraction on all Faculty Bios: End Run")"""
 
+"""# Uncomment this section if you want to benchmark batch email extraction against per-bio email extraction on all faculty bios
+print("Email Extraction Throughput on all Faculty Bios: Begin Run")
+test_extraction = TestEntityExtraction()
+throughput = test_extraction.test_email_extraction_throughput()
+print("Email Extraction Throughput on all Faculty Bios: End Run")
+print("Email Extraction Throughput for Per-Bio & Batch Methods: ", throughput)"""
+
+"""# Uncomment this section if you want to check that distributed extraction with 2 local workers gives the same results as a single process
+print("Distributed Extraction with 2 Local Workers: Begin Run")
+test_extraction = TestEntityExtraction(run_subset=20)
+runtimes = test_extraction.test_distributed_extractions(num_workers=2)
+print("Distributed Extraction with 2 Local Workers: End Run")
+print("Runtimes for Single-Process & Distributed Extraction: ", runtimes)"""
+
 print("Test New Faculty Bio Entity Extraction Methodology: Begin Run")
 test_extraction = TestEntityExtraction()
 metrics = test_extraction.test_extraction_performance()
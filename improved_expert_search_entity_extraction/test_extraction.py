@@ -1,22 +1,37 @@
 import os
+import sys
 import codecs
+import shutil
+import tempfile
+import subprocess
 import numpy as np
+from datetime import datetime
 
 from extract_entities import ExtractBioEntities
 from generate_human_labels import get_human_generated_labels
 
 
 class TestEntityExtraction:
-    def __init__(self, seed=0, run_subset=100):
+    def __init__(
+        self,
+        seed=0,
+        run_subset=100,
+        fast_labels=False,
+        labels_path=os.path.join("test_results", "fast_user_generated_labels.csv"),
+    ):
         """Initialize variables for instance of test_entity_extraction class
 
         Args:
             seed (int, optional): positive integer indicating random seed to use. Defaults to 0.
             run_subset (int, optional): positive integer indicating number of results to retrieve. Defaults to 100.
+            fast_labels (bool, optional): get human-generated labels with fast labeling mode. Defaults to False.
+            labels_path (str, optional): csv file of fast labeling mode labels. Defaults to "test_results/fast_user_generated_labels.csv".
         """
         self.new_entity_extraction = ExtractBioEntities()
         self.seed = seed
         self.run_subset = run_subset
+        self.fast_labels = fast_labels
+        self.labels_path = labels_path
 
     def test_extraction_performance(self):
         """Retrieves subset of new and old entity extraction results. Retrieves same subset of human-generated labels.
@@ -49,7 +64,10 @@ class TestEntityExtraction:
 
         # get human generated labels
         num_run, has_name, has_email = get_human_generated_labels(
-            self.seed, self.run_subset
+            self.seed,
+            self.run_subset,
+            fast=self.fast_labels,
+            labels_path=self.labels_path,
         )
 
         # get confusion matrix stats for names and emails
@@ -114,6 +132,117 @@ class TestEntityExtraction:
 
         return metrics_dict
 
+    def test_email_extraction_throughput(self, output_folder="results"):
+        """Benchmarks corpus-wide email address extraction. Runs the per-bio path (clean_bio_for_emails() and
+        extract_emails() on one bio at a time) and the batch path (extract_emails_batch() on all bios at once) over
+        every faculty bio, using the names already saved in output_folder, and checks that both paths extract the
+        same email addresses.
+
+        Args:
+            output_folder (str, optional): folder with NEW_names.txt from a full extraction run. Defaults to "results".
+
+        Returns:
+            throughput_dict (dict): runtime in seconds, bios per second, and email addresses per second for each path,
+                plus the number of bios where the two paths disagree
+        """
+        bios_path, name_path, _ = self.new_entity_extraction.get_file_paths(
+            output_folder
+        )
+        with codecs.open(name_path, encoding="utf-8", errors="ignore") as f:
+            names = f.read().split("\n")
+
+        bios_to_run = range(min(len(os.listdir(bios_path)), len(names)))
+        bios = self.new_entity_extraction.load_bios(bios_path, bios_to_run)
+        names = names[: len(bios)]
+
+        # per-bio path
+        start = datetime.now()
+        per_bio_emails = []
+        for bio, name in zip(bios, names):
+            cleaned_bio = self.new_entity_extraction.clean_bio_for_emails(bio)
+            per_bio_emails.append(
+                self.new_entity_extraction.extract_emails(cleaned_bio, name)
+            )
+        per_bio_runtime = (datetime.now() - start).total_seconds()
+
+        # batch path
+        start = datetime.now()
+        batch_emails = self.new_entity_extraction.extract_emails_batch(bios, names)
+        batch_runtime = (datetime.now() - start).total_seconds()
+
+        num_emails = sum(self.convert_extraction_to_label(batch_emails))
+        throughput_dict = {"per_bio_results": {}, "batch_results": {}}
+        for key, runtime in [
+            ("per_bio_results", per_bio_runtime),
+            ("batch_results", batch_runtime),
+        ]:
+            throughput_dict[key]["runtime"] = runtime
+            throughput_dict[key]["bios_per_second"] = len(bios) / runtime
+            throughput_dict[key]["emails_per_second"] = num_emails / runtime
+        throughput_dict["num_mismatches"] = sum(
+            per_bio != batch for per_bio, batch in zip(per_bio_emails, batch_emails)
+        )
+
+        return throughput_dict
+
+    def test_distributed_extractions(self, num_workers=2):
+        """Runs the distributed mode on one machine. Starts num_workers local workers with start_local_workers() in a
+        background process, runs perform_extractions() on self.run_subset faculty bios through a temporary work queue,
+        and checks that the merged names and email addresses equal those of a single-process run.
+
+        Args:
+            num_workers (int, optional): number of local worker processes to start. Defaults to 2.
+
+        Returns:
+            runtime_dict (dict): runtime in seconds of the single-process and distributed runs
+        """
+        # single-process run
+        start = datetime.now()
+        names, email_addresses = self.new_entity_extraction.perform_extractions(
+            seed=self.seed, run_subset=self.run_subset, output_folder="test_results"
+        )
+        single_runtime = (datetime.now() - start).total_seconds()
+
+        # distributed run with workers started before the faculty bios are published, working on the first run of
+        # the new work queue so they exit even if the run finishes before they have loaded the model
+        queue_dir = tempfile.mkdtemp()
+        queue_path = os.path.join(queue_dir, "work_queue.db")
+        try:
+            start = datetime.now()
+            workers = subprocess.Popen(
+                [
+                    sys.executable,
+                    "distribute_extractions.py",
+                    queue_path,
+                    str(num_workers),
+                    "--run-id",
+                    "1",
+                ]
+            )
+            (
+                distributed_names,
+                distributed_email_addresses,
+            ) = self.new_entity_extraction.perform_extractions(
+                seed=self.seed,
+                run_subset=self.run_subset,
+                output_folder="test_results",
+                queue_path=queue_path,
+            )
+            workers.wait()
+            distributed_runtime = (datetime.now() - start).total_seconds()
+        finally:
+            shutil.rmtree(queue_dir)
+
+        assert distributed_names == names
+        assert distributed_email_addresses == email_addresses
+
+        runtime_dict = {
+            "single_process_runtime": single_runtime,
+            "distributed_runtime": distributed_runtime,
+        }
+
+        return runtime_dict
+
     def calc_confusion_matrix(self, predicted_labels, truth_labels):
         """Calculates the integer value of each box in a confusion matrix - i.e., number of true positives,
         true negatives, false positives, and false negatives - given two lists of the same length with identical